@@ -1,14 +1,210 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import requests
-from datetime import datetime
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = 'http://ergast.com/api/f1'
+
+# Seasons shown when the API cannot be reached
+FALLBACK_SEASONS = [str(year) for year in range(2024, 1949, -1)]
+
+
+def _build_url(endpoint, offset=0, limit=1000):
+    """Build the Ergast API URL for an endpoint page"""
+    return f"{BASE_URL}/{endpoint}.json?limit={limit}&offset={offset}"
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache data for 1 hour
+def _fetch_json(url):
+    """Fetch and decode a JSON document; request errors propagate and are not cached"""
+    response = requests.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=86400, show_spinner=False)  # The season list changes about once a year
+def _seasons_list():
+    """Fetch all F1 seasons, newest first; request and payload errors propagate and are not cached"""
+    data = _fetch_json(_build_url('seasons', limit=100))
+    if not data or 'MRData' not in data or 'SeasonTable' not in data['MRData']:
+        raise ValueError("Unexpected seasons payload")
+    seasons = data['MRData']['SeasonTable']['Seasons']
+    return sorted((season['season'] for season in seasons), key=int, reverse=True)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_season(year):
+    """Load a season's results with the time they were loaded; request errors propagate and are not cached"""
+    return _season_results_frame(year), time.time()
+
+
+def _season_results_frame(year):
+    """Fetch a season's race results as a flat DataFrame"""
+    limit = 1000
+    
+    data = _fetch_json(_build_url(f'{year}/results', offset=0, limit=limit))
+    if not data or 'MRData' not in data or 'RaceTable' not in data['MRData']:
+        return pd.DataFrame()
+    pages = [data]
+    total = int(data['MRData']['total'])
+    if total > limit:
+        # Fetch any remaining pages concurrently rather than one after another
+        urls = [_build_url(f'{year}/results', offset=offset, limit=limit)
+                for offset in range(limit, total, limit)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages.extend(executor.map(_fetch_json, urls))
+    
+    races = []
+    for data in pages:
+        if not data or 'MRData' not in data or 'RaceTable' not in data['MRData']:
+            continue
+        races.extend(data['MRData']['RaceTable']['Races'])
+        
+    if not races:
+        return pd.DataFrame()
+        
+    # Flatten one row per result, carrying the race details alongside. Only the
+    # first level of nesting (Driver.*, Constructor.*) is needed, so deeper
+    # objects such as FastestLap.Time are left unexpanded.
+    results = pd.json_normalize(
+        races,
+        record_path='Results',
+        meta=['raceName', 'round', 'date'],
+        max_level=1
+    )
+    if results.empty:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame({
+        'round': results['round'].astype('int16'),
+        'race': results['raceName'],
+        'date': pd.to_datetime(results['date']),
+        'driver': results['Driver.givenName'] + ' ' + results['Driver.familyName'],
+        'constructor': results['Constructor.name'],
+        'position': pd.to_numeric(results['position'], errors='coerce').astype('Int8'),
+        'points': pd.to_numeric(results['points'], errors='coerce').fillna(0.0).astype('float32'),
+        'status': results['status'].fillna('')
+    })
+    # Numbers are stored in the narrowest dtype that fits and repeated labels as
+    # categories, so grouping works on integer codes over less memory
+    for column in ('driver', 'constructor', 'race', 'status'):
+        df[column] = df[column].astype('category')
+    return df.sort_values(['round', 'position'])
+
+
+# Chart figures are keyed on the season, the time its data was loaded and the
+# filter values only; the leading underscore tells Streamlit not to hash the
+# DataFrame derived from them.
+# Plotly is imported inside the chart builders so it is only loaded once a
+# chart is actually drawn.
+@st.cache_resource(ttl=3600, max_entries=64)
+def _driver_standings_chart(season, loaded_at, filters_key, _df):
+    """Create cumulative points chart for drivers"""
+    import plotly.express as px
+    
+    df_cumsum = (
+        _df.groupby(['round', 'race', 'driver'], observed=True, sort=False)['points'].sum()
+        .unstack('driver', fill_value=0)
+        .cumsum()
+    )
+    
+    # Long form lets a single px.line call draw every driver
+    races = df_cumsum.index.get_level_values('race')
+    long_df = df_cumsum.reset_index().melt(
+        id_vars=['round', 'race'],
+        var_name='driver',
+        value_name='points'
+    )
+    
+    fig = px.line(
+        long_df,
+        x='race',
+        y='points',
+        color='driver',
+        category_orders={'race': list(races)},
+        markers=True,
+        render_mode='webgl'
+    )
+    
+    fig.update_layout(
+        title='Driver Points Progression Through Season',
+        xaxis_title='Race',
+        yaxis_title='Cumulative Points',
+        height=600,
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=1.05
+        )
+    )
+    return fig
+
+
+@st.cache_resource(ttl=3600, max_entries=64)
+def _constructor_performance_chart(season, loaded_at, filters_key, _df):
+    """Create constructor performance chart"""
+    import plotly.express as px
+    
+    constructor_points = _df.groupby('constructor', observed=True, sort=False)['points'].sum().sort_values(ascending=True)
+    
+    fig = px.bar(
+        constructor_points,
+        orientation='h',
+        title='Constructor Performance',
+        labels={'value': 'Total Points', 'constructor': 'Constructor'},
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_resource(ttl=3600, max_entries=64)
+def _podium_finishes_chart(season, loaded_at, filters_key, _df):
+    """Create podium finishes chart"""
+    import plotly.express as px
+    
+    # Count podiums per driver category code rather than hashing driver names
+    podium = _df['position'].between(1, 3).to_numpy(dtype=bool, na_value=False)
+    drivers = _df['driver'].cat
+    counts = np.bincount(drivers.codes.to_numpy()[podium], minlength=len(drivers.categories))
+    on_podium = counts > 0
+    
+    fig = px.pie(
+        values=counts[on_podium],
+        names=drivers.categories[on_podium],
+        title='Podium Finishes Distribution',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _to_csv_bytes(season, loaded_at, filters_key, _df):
+    """Serialize the filtered DataFrame to CSV bytes using Arrow's CSV writer"""
+    table = pa.Table.from_pandas(_df, preserve_index=False)
+    # Write categorical columns as their plain string values and timestamps as dates
+    schema = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        elif pa.types.is_timestamp(field.type):
+            field = field.with_type(pa.date32())
+        schema.append(field)
+    table = table.cast(pa.schema(schema))
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(table, buffer)
+    return buffer.getvalue().to_pybytes()
+
 
 class F1Dashboard:
     def __init__(self):
-        self.base_url = 'http://ergast.com/api/f1'
         st.set_page_config(
             page_title="F1 Dashboard",
             layout="wide",
@@ -25,155 +221,38 @@ class F1Dashboard:
         if 'dark_mode' not in st.session_state:
             st.session_state.dark_mode = False
 
-    def fetch_data(self, endpoint, offset=0, limit=1000):
-        """Fetch data from Ergast API with pagination and caching"""
-        @st.cache_data(ttl=3600)  # Cache data for 1 hour
-        def fetch_cached(url):
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                return response.json()
-            except requests.RequestException as e:
-                st.error(f"Error fetching data: {str(e)}")
-                return None
-            
-        url = f"{self.base_url}/{endpoint}.json?limit={limit}&offset={offset}"
-        return fetch_cached(url)
-
     def get_seasons_list(self):
-        """Get list of F1 seasons with error handling"""
+        """Get list of F1 seasons, falling back to the known seasons on error"""
         try:
-            data = self.fetch_data('seasons', limit=100)
-            if data and 'MRData' in data and 'SeasonTable' in data['MRData']:
-                seasons = data['MRData']['SeasonTable']['Seasons']
-                return sorted([season['season'] for season in seasons], reverse=True)
-            else:
-                st.error("Unable to fetch seasons data. Please try again later.")
-                return ["2023"]
-        except Exception as e:
+            seasons = _seasons_list()
+        except requests.RequestException as e:
             st.error(f"Error getting seasons list: {str(e)}")
-            return ["2023"]
+            return FALLBACK_SEASONS
+        except ValueError:
+            st.error("Unable to fetch seasons data. Please try again later.")
+            return FALLBACK_SEASONS
+        return seasons
 
     def get_season_results(self, year):
-        """Get race results for a specific season with pagination"""
-        all_results = []
-        offset = 0
-        limit = 100
-        
-        while True:
-            data = self.fetch_data(f'{year}/results', offset=offset, limit=limit)
-            if not data or 'MRData' not in data or 'RaceTable' not in data['MRData']:
-                break
-                
-            races = data['MRData']['RaceTable']['Races']
-            if not races:
-                break
-                
-            for race in races:
-                race_name = race['raceName']
-                round_num = int(race['round'])
-                race_date = race['date']
-                
-                for result in race['Results']:
-                    position = result.get('position', 'DNF')
-                    position = int(position) if position.isdigit() else None
-                    
-                    try:
-                        points = float(result.get('points', 0))
-                    except (ValueError, TypeError):
-                        points = 0
-                    
-                    all_results.append({
-                        'round': round_num,
-                        'race': race_name,
-                        'date': race_date,
-                        'driver': f"{result['Driver']['givenName']} {result['Driver']['familyName']}",
-                        'constructor': result['Constructor']['name'],
-                        'position': position,
-                        'points': points,
-                        'status': result.get('status', '')
-                    })
+        """Get race results for a specific season and the time they were loaded"""
+        try:
+            df, loaded_at = _load_season(year)
+        except requests.RequestException as e:
+            st.error(f"Error fetching data: {str(e)}")
+            return pd.DataFrame(), None
             
-            offset += limit
-            total = int(data['MRData']['total'])
-            if offset >= total:
-                break
-                
-        if not all_results:
+        if df.empty:
             st.warning(f"No results found for season {year}")
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(all_results)
-        df['date'] = pd.to_datetime(df['date'])
-        return df.sort_values(['round', 'position'])
-
-    def create_driver_standings_chart(self, df):
-        """Create cumulative points chart for drivers"""
-        df_sorted = df.sort_values(['date', 'round'])
-        df_cumsum = df_sorted.pivot_table(
-            index=['round', 'race'],
-            columns='driver',
-            values='points',
-            aggfunc='sum'
-        ).cumsum()
-        
-        fig = go.Figure()
-        for driver in df_cumsum.columns:
-            fig.add_trace(go.Scatter(
-                x=df_cumsum.index.get_level_values('race'),
-                y=df_cumsum[driver],
-                name=driver,
-                mode='lines+markers'
-            ))
-        
-        fig.update_layout(
-            title='Driver Points Progression Through Season',
-            xaxis_title='Race',
-            yaxis_title='Cumulative Points',
-            height=600,
-            showlegend=True,
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=1.05
-            )
-        )
-        return fig
-
-    def create_constructor_performance_chart(self, df):
-        """Create constructor performance chart"""
-        constructor_points = df.groupby('constructor')['points'].sum().sort_values(ascending=True)
-        
-        fig = px.bar(
-            constructor_points,
-            orientation='h',
-            title='Constructor Performance',
-            labels={'value': 'Total Points', 'constructor': 'Constructor'},
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_layout(height=400)
-        return fig
-
-    def create_podium_finishes_chart(self, df):
-        """Create podium finishes chart"""
-        podium_counts = df[df['position'].between(1, 3)]['driver'].value_counts()
-        
-        fig = px.pie(
-            values=podium_counts.values,
-            names=podium_counts.index,
-            title='Podium Finishes Distribution',
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_layout(height=400)
-        return fig
+        return df, loaded_at
 
     def show_constructor_comparison(self, df):
         """Show detailed constructor comparison stats with visualizations"""
+        import plotly.express as px
+        
         st.subheader("Constructor Comparison")
         
         # Calculate comparison metrics
-        comparison_metrics = df.groupby('constructor').agg({
+        comparison_metrics = df.groupby('constructor', observed=True, sort=False).agg({
             'points': ['sum', 'mean'],
             'position': ['mean', 'min'],
             'race': 'count'
@@ -187,35 +266,45 @@ class F1Dashboard:
         
         with tab1:
             # Points progression through the season
-            points_prog = df.pivot_table(
-                index='round',
-                columns='constructor',
-                values='points',
-                aggfunc='sum'
-            ).cumsum()
+            points_prog = (
+                df.groupby(['round', 'constructor'], observed=True, sort=False)['points'].sum()
+                .unstack('constructor', fill_value=0)
+                .cumsum()
+            )
+            points_prog = points_prog.reset_index().melt(
+                id_vars='round',
+                var_name='constructor',
+                value_name='points'
+            )
             
             fig = px.line(
                 points_prog,
+                x='round',
+                y='points',
+                color='constructor',
                 title="Constructor Points Progression",
-                labels={'value': 'Cumulative Points', 'round': 'Race Round'},
-                markers=True
+                labels={'points': 'Cumulative Points', 'round': 'Race Round'},
+                markers=True,
+                render_mode='webgl'
             )
             st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
-            # Average position by race
+            # Average position by race, in calendar order
             avg_pos = df.pivot_table(
-                index='race',
+                index=['round', 'race'],
                 columns='constructor',
                 values='position',
-                aggfunc='mean'
-            )
+                aggfunc='mean',
+                observed=True
+            ).droplevel('round')
             
             fig = px.line(
                 avg_pos,
                 title="Average Race Positions",
                 labels={'value': 'Position (Lower is Better)', 'race': 'Race'},
-                markers=True
+                markers=True,
+                render_mode='webgl'
             )
             # Invert y-axis since lower position is better
             fig.update_layout(yaxis={'autorange': 'reversed'})
@@ -236,23 +325,27 @@ class F1Dashboard:
 
     def show_driver_comparison(self, df, drivers):
         """Show head-to-head driver comparison with visualizations"""
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
         st.subheader("Driver Head-to-Head")
         
-        # Calculate driver statistics
-        driver_stats = []
-        for driver in drivers:
-            driver_df = df[df['driver'] == driver]
-            stats = {
-                'Driver': driver,
-                'Points': driver_df['points'].sum(),
-                'Avg Position': round(driver_df['position'].mean(), 2),
-                'Podiums': len(driver_df[driver_df['position'] <= 3]),
-                'Races': len(driver_df),
-                'Wins': len(driver_df[driver_df['position'] == 1])
-            }
-            driver_stats.append(stats)
-        
-        comparison_df = pd.DataFrame(driver_stats)
+        # Calculate driver statistics in a single pass; podiums and wins are
+        # precomputed as boolean columns so every aggregate is a plain reduction
+        driver_df = df[df['driver'].isin(drivers)].assign(
+            podium=lambda d: d['position'].le(3),
+            win=lambda d: d['position'].eq(1)
+        )
+        comparison_df = driver_df.groupby('driver', observed=True, sort=False).agg(
+            Points=('points', 'sum'),
+            AvgPosition=('position', 'mean'),
+            Podiums=('podium', 'sum'),
+            Races=('race', 'size'),
+            Wins=('win', 'sum')
+        ).reindex(drivers)
+        comparison_df['AvgPosition'] = comparison_df['AvgPosition'].round(2)
+        comparison_df = comparison_df.rename(columns={'AvgPosition': 'Avg Position'}) \
+            .rename_axis('Driver').reset_index()
         
         # Create visualization tabs
         tab1, tab2, tab3 = st.tabs(["Overview", "Race Performance", "Points Progression"])
@@ -298,17 +391,19 @@ class F1Dashboard:
         
         with tab2:
             # Race position comparison
+            # Races are indexed by round as well so they follow the calendar
             race_positions = df[df['driver'].isin(drivers)].pivot(
-                index='race',
+                index=['round', 'race'],
                 columns='driver',
                 values='position'
-            )
+            ).droplevel('round')
             
             fig = px.line(
                 race_positions,
                 title="Race Positions Comparison",
                 labels={'value': 'Position', 'race': 'Race'},
-                markers=True
+                markers=True,
+                render_mode='webgl'
             )
             # Invert y-axis since lower position is better
             fig.update_layout(yaxis={'autorange': 'reversed'})
@@ -316,18 +411,19 @@ class F1Dashboard:
         
         with tab3:
             # Points progression
-            points_prog = df[df['driver'].isin(drivers)].pivot_table(
-                index='round',
-                columns='driver',
-                values='points',
-                aggfunc='sum'
-            ).cumsum()
+            points_prog = (
+                df[df['driver'].isin(drivers)]
+                .groupby(['round', 'driver'], observed=True, sort=False)['points'].sum()
+                .unstack('driver', fill_value=0)
+                .cumsum()
+            )
             
             fig = px.line(
                 points_prog,
                 title="Points Progression Through Season",
                 labels={'value': 'Cumulative Points', 'round': 'Race Round'},
-                markers=True
+                markers=True,
+                render_mode='webgl'
             )
             st.plotly_chart(fig, use_container_width=True)
 
@@ -360,8 +456,9 @@ class F1Dashboard:
             )
             
         with col4:
-            points_leader = df.groupby('driver')['points'].sum().idxmax()
-            points = int(df.groupby('driver')['points'].sum().max())
+            driver_points = df.groupby('driver', observed=True, sort=False)['points'].sum()
+            points_leader = driver_points.idxmax()
+            points = int(driver_points.max())
             st.metric(
                 "Points Leader",
                 points_leader,
@@ -432,45 +529,64 @@ class F1Dashboard:
         return selected_season, filters
 
 
+    def filters_key(self, filters):
+        """Build a hashable key identifying the active filter values"""
+        return (
+            tuple(filters.get('points_range', ())),
+            tuple(sorted(filters.get('selected_races', []))),
+            tuple(filters.get('position_range', ())),
+            tuple(sorted(filters.get('selected_constructors', [])))
+        )
+
     def apply_filters(self, df, filters):
         """Apply all filters to the DataFrame"""
-        filtered_df = df.copy()
+        # Combine every filter into one mask so the frame is only indexed once.
+        # Filters that span the whole domain (the widget defaults) are skipped.
+        mask = np.ones(len(df), dtype=bool)
+        filtered = False
         
         # Apply points range filter
         if 'points_range' in filters:
             min_points, max_points = filters['points_range']
-            filtered_df = filtered_df[filtered_df['points'].between(min_points, max_points)]
+            if min_points > df['points'].min() or max_points < df['points'].max():
+                mask &= df['points'].between(min_points, max_points).to_numpy()
+                filtered = True
         
         # Apply race filter
         if 'selected_races' in filters and filters['selected_races']:
-            filtered_df = filtered_df[filtered_df['race'].isin(filters['selected_races'])]
+            if not set(filters['selected_races']).issuperset(df['race'].cat.categories):
+                mask &= df['race'].isin(filters['selected_races']).to_numpy()
+                filtered = True
         
         # Apply position filter
         if 'position_range' in filters:
             min_pos, max_pos = filters['position_range']
-            # Only filter where position is not None (handles DNF, DSQ etc.)
-            position_mask = (filtered_df['position'].notna()) & \
-                          (filtered_df['position'].between(min_pos, max_pos))
-            filtered_df = filtered_df[position_mask]
+            positions = df['position']
+            if positions.hasnans or min_pos > positions.min() or max_pos < positions.max():
+                # Missing positions (DNF, DSQ etc.) never match the range
+                mask &= positions.between(min_pos, max_pos).to_numpy(dtype=bool, na_value=False)
+                filtered = True
         
         # Apply constructor filter
         if 'selected_constructors' in filters and filters['selected_constructors']:
-            filtered_df = filtered_df[filtered_df['constructor'].isin(filters['selected_constructors'])]
+            if not set(filters['selected_constructors']).issuperset(df['constructor'].cat.categories):
+                mask &= df['constructor'].isin(filters['selected_constructors']).to_numpy()
+                filtered = True
         
-        return filtered_df
+        return df[mask] if filtered else df
 
 
-    def create_interactive_charts(self, df, points_range):
+    def create_interactive_charts(self, df, season, loaded_at, filters_key):
         """Create and display interactive charts"""
         # Driver Standings Chart
-        driver_fig = self.create_driver_standings_chart(df)
+        driver_fig = _driver_standings_chart(season, loaded_at, filters_key, df)
         st.plotly_chart(driver_fig, use_container_width=True)
         
         # Two-column layout for secondary charts
         col1, col2 = st.columns(2)
         
         with col1:
-            constructor_fig = self.create_constructor_performance_chart(df)
+            constructor_fig = _constructor_performance_chart(season, loaded_at, filters_key, df)
             st.plotly_chart(constructor_fig, use_container_width=True)
             
             if st.session_state.comparison_mode:
@@ -484,7 +600,7 @@ class F1Dashboard:
                     self.show_constructor_comparison(comparison_df)
         
         with col2:
-            podium_fig = self.create_podium_finishes_chart(df)
+            podium_fig = _podium_finishes_chart(season, loaded_at, filters_key, df)
             st.plotly_chart(podium_fig, use_container_width=True)
             
             if st.session_state.comparison_mode:
@@ -515,7 +631,7 @@ class F1Dashboard:
         
         # Main dashboard content
         with st.spinner(f'Loading {selected_season} season data...'):
-            df = self.get_season_results(selected_season)
+            df, loaded_at = self.get_season_results(selected_season)
             
             if not df.empty:
                 # Store the original dataset for filter options
@@ -538,14 +654,15 @@ class F1Dashboard:
                 self.display_kpi_cards(filtered_df)
                 
                 # Create and display interactive charts
-                self.create_interactive_charts(filtered_df, filters.get('points_range', (0, 400)))
+                filters_key = self.filters_key(filters)
+                self.create_interactive_charts(filtered_df, selected_season, loaded_at, filters_key)
                 
                 # Add data exploration section
                 with st.expander("Explore Raw Data"):
                     st.dataframe(filtered_df)
                     
                     # Add export functionality
-                    csv = filtered_df.to_csv(index=False)
+                    csv = _to_csv_bytes(selected_season, loaded_at, filters_key, filtered_df)
                     st.download_button(
                         "Download Data as CSV",
                         csv,